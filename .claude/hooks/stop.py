@@ -3,21 +3,37 @@
 # requires-python = ">=3.11"
 # dependencies = [
 #     "python-dotenv",
+#     "orjson",
+#     "elevenlabs",
+#     "openai[voice_helpers]",
+#     "anthropic",
 # ]
 # ///
 
 import argparse
+import contextlib
+import functools
+import hashlib
+import importlib.util
 import json
+import mmap
 import os
+import queue
 import sys
 import random
 import subprocess
 import re
+import signal
+import socket
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Iterable, Iterator
 from collections import defaultdict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from dotenv import load_dotenv
@@ -25,140 +41,447 @@ try:
 except ImportError:
     pass  # dotenv is optional
 
+try:
+    import orjson
+    
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        """Serialize to compact (or 2-space indented) JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    
+    json_loads = orjson.loads
+except ImportError:
+    # orjson is optional; fall back to the stdlib json module
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        """Serialize to compact (or 2-space indented) JSON bytes."""
+        if indent:
+            return json.dumps(obj, indent=2).encode()
+        return json.dumps(obj, separators=(',', ':')).encode()
+    
+    json_loads = json.loads
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # hyperscan is optional; diffs are scanned with re instead
+
+# Helper script locations
+HOOKS_DIR = Path(__file__).parent
+TTS_DIR = HOOKS_DIR / "utils" / "tts"
+LLM_DIR = HOOKS_DIR / "utils" / "llm"
+
+# API keys available to this hook run, snapshotted once after .env is loaded
+API_KEYS = {
+    "ELEVENLABS": bool(os.getenv('ELEVENLABS_API_KEY')),
+    "OPENAI": bool(os.getenv('OPENAI_API_KEY')),
+    "ANTHROPIC": bool(os.getenv('ANTHROPIC_API_KEY')),
+}
+
+# Friendly completion messages used when no LLM message is available
+COMPLETION_MESSAGES = (
+    "Work complete!",
+    "All done!",
+    "Task finished!",
+    "Job complete!",
+    "Ready for next task!"
+)
+
+# Completion messages are cached per provider in 10-minute buckets so rapid
+# back-to-back Stop events reuse one LLM response instead of re-spawning it.
+LLM_MSG_CACHE_FILE = "llm_msg_cache.json"
+LLM_MSG_CACHE_TTL = 3600
+LLM_MSG_CACHE_BUCKET = 600
+
+# Per-provider timeout (seconds) for LLM completion message generation
+LLM_TIMEOUT = 10
+
+# Timeout (seconds) for speaking the completion message, in-process or via `uv run`
+TTS_TIMEOUT = 20
+
+# Local Ollama server used by utils/llm/ollama.py
+OLLAMA_ADDRESS = ("localhost", 11434)
+
+# HTTP timeouts (seconds) passed to the TTS helpers' API clients through the environment
+HTTP_TIMEOUT_ENV = {"HOOK_CONNECT_TIMEOUT": "3", "HOOK_READ_TIMEOUT": "7"}
+
+# HTTP timeouts (seconds) for the LLM helpers; connect + read stays under LLM_TIMEOUT
+LLM_HTTP_TIMEOUT_ENV = {"HOOK_CONNECT_TIMEOUT": "2", "HOOK_READ_TIMEOUT": "7"}
+
+# Third-party package each utils helper needs to run in-process; all are declared
+# in this script's dependencies. pyttsx3 is left to `uv run`: its engine has to
+# run on the main thread on macOS, but in-process speech runs on a worker thread.
+HELPER_DEPENDENCIES = {
+    "elevenlabs_tts": "elevenlabs",
+    "openai_tts": "openai",
+    "oai": "openai",
+    "anth": "anthropic",
+    "ollama": "openai",
+}
+
+# Imported helper modules (None when a helper must run via `uv run`)
+_helper_modules = {}
+_helper_modules_lock = threading.Lock()
+
 
 def get_completion_messages():
-    """Return list of friendly completion messages."""
-    return [
-        "Work complete!",
-        "All done!",
-        "Task finished!",
-        "Job complete!",
-        "Ready for next task!"
-    ]
+    """Return the friendly completion messages."""
+    return COMPLETION_MESSAGES
+
+
+def load_helper_module(script_path, timeout_env: Dict[str, str]):
+    """
+    Import a utils helper script so it can be called in-process, applying the
+    HTTP timeouts it would otherwise read from timeout_env under `uv run`.
+    Returns None when the helper's dependencies are not installed in this
+    environment, in which case callers fall back to `uv run`.
+    """
+    script_path = Path(script_path)
+    name = script_path.stem
+    
+    with _helper_modules_lock:
+        if name in _helper_modules:
+            return _helper_modules[name]
+        
+        module = None
+        dependency = HELPER_DEPENDENCIES.get(name)
+        if dependency and importlib.util.find_spec(dependency) is not None:
+            try:
+                spec = importlib.util.spec_from_file_location(f"hook_utils_{name}", script_path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            except ImportError:
+                module = None
+        if module is not None:
+            module.CONNECT_TIMEOUT = float(timeout_env["HOOK_CONNECT_TIMEOUT"])
+            module.READ_TIMEOUT = float(timeout_env["HOOK_READ_TIMEOUT"])
+        
+        _helper_modules[name] = module
+        return module
 
 
+@functools.lru_cache(maxsize=None)
 def get_tts_script_path():
     """
     Determine which TTS script to use based on available API keys.
     Priority order: ElevenLabs > OpenAI > pyttsx3
+    The result is resolved once per process.
     """
-    # Get current script directory and construct utils/tts path
-    script_dir = Path(__file__).parent
-    tts_dir = script_dir / "utils" / "tts"
-    
     # Check for ElevenLabs API key (highest priority)
-    if os.getenv('ELEVENLABS_API_KEY'):
-        elevenlabs_script = tts_dir / "elevenlabs_tts.py"
+    if API_KEYS["ELEVENLABS"]:
+        elevenlabs_script = TTS_DIR / "elevenlabs_tts.py"
         if elevenlabs_script.exists():
             return str(elevenlabs_script)
     
     # Check for OpenAI API key (second priority)
-    if os.getenv('OPENAI_API_KEY'):
-        openai_script = tts_dir / "openai_tts.py"
+    if API_KEYS["OPENAI"]:
+        openai_script = TTS_DIR / "openai_tts.py"
         if openai_script.exists():
             return str(openai_script)
     
     # Fall back to pyttsx3 (no API key required)
-    pyttsx3_script = tts_dir / "pyttsx3_tts.py"
+    pyttsx3_script = TTS_DIR / "pyttsx3_tts.py"
     if pyttsx3_script.exists():
         return str(pyttsx3_script)
     
     return None
 
 
+def is_ollama_running() -> bool:
+    """Check whether a local Ollama server is accepting connections."""
+    try:
+        with socket.create_connection(OLLAMA_ADDRESS, timeout=0.1):
+            return True
+    except OSError:
+        return False
+
+
+def get_llm_msg_cache_path():
+    """Return the path of the on-disk completion message cache."""
+    return Path(os.getcwd()) / "logs" / LLM_MSG_CACHE_FILE
+
+
+def get_llm_msg_cache_key(provider: str, now: float) -> str:
+    """Build the cache key for a provider and the current time bucket."""
+    date_bucket = int(now // LLM_MSG_CACHE_BUCKET)
+    return hashlib.sha256(f"{provider}:{date_bucket}".encode()).hexdigest()
+
+
+def read_llm_msg_cache(cache_path: Path) -> Dict[str, Dict]:
+    """Read the completion message cache, returning an empty dict on any error."""
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def write_atomically(path, data: bytes):
+    """
+    Replace path with data via a temp file unique to this process and thread,
+    so hooks running at the same time never write into the same temp file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_llm_msg_cache(cache_path: Path, cache: Dict[str, Dict]):
+    """Atomically write the completion message cache."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(cache_path, json_dumps(cache))
+    except OSError:
+        pass  # Caching is best effort
+
+
 def get_llm_completion_message():
     """
     Generate completion message using available LLM services.
+    Responses are cached on disk so repeated Stop events skip the LLM call.
     Priority order: OpenAI > Anthropic > Ollama > fallback to random message
     
     Returns:
         str: Generated or fallback completion message
     """
-    # Get current script directory and construct utils/llm path
-    script_dir = Path(__file__).parent
-    llm_dir = script_dir / "utils" / "llm"
-    
-    # Try OpenAI first (highest priority)
-    if os.getenv('OPENAI_API_KEY'):
-        oai_script = llm_dir / "oai.py"
-        if oai_script.exists():
-            try:
-                result = subprocess.run([
-                    "uv", "run", str(oai_script), "--completion"
-                ], 
-                capture_output=True,
-                text=True,
-                timeout=10
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    return result.stdout.strip()
-            except (subprocess.TimeoutExpired, subprocess.SubprocessError):
-                pass
-    
-    # Try Anthropic second
-    if os.getenv('ANTHROPIC_API_KEY'):
-        anth_script = llm_dir / "anth.py"
-        if anth_script.exists():
-            try:
-                result = subprocess.run([
-                    "uv", "run", str(anth_script), "--completion"
-                ], 
-                capture_output=True,
-                text=True,
-                timeout=10
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    return result.stdout.strip()
-            except (subprocess.TimeoutExpired, subprocess.SubprocessError):
-                pass
-    
-    # Try Ollama third (local LLM)
-    ollama_script = llm_dir / "ollama.py"
-    if ollama_script.exists():
+    scripts = get_llm_scripts()
+    if not scripts:
+        # No LLM can answer; skip the cache and pick a predefined message
+        return random.choice(COMPLETION_MESSAGES)
+    
+    now = time.time()
+    cache_path = get_llm_msg_cache_path()
+    cache_key = get_llm_msg_cache_key(scripts[0].stem, now)
+    cache = read_llm_msg_cache(cache_path)
+    
+    entry = cache.get(cache_key)
+    if isinstance(entry, dict) and now < entry.get("expires", 0) and entry.get("msg"):
+        return entry["msg"]
+    
+    message = generate_llm_completion_message(scripts)
+    if not message:
+        # Fallback to random predefined message (not cached)
+        return random.choice(COMPLETION_MESSAGES)
+    
+    # Drop expired entries and store the fresh message
+    cache = {key: value for key, value in cache.items()
+             if isinstance(value, dict) and now < value.get("expires", 0)}
+    cache[cache_key] = {"msg": message, "expires": now + LLM_MSG_CACHE_TTL}
+    write_llm_msg_cache(cache_path, cache)
+    
+    return message
+
+
+@functools.lru_cache(maxsize=None)
+def get_installed_llm_scripts() -> Tuple[Tuple[Path, ...], Optional[Path]]:
+    """
+    Resolve the LLM helper scripts once per process: the API-key providers
+    (OpenAI > Anthropic) that are configured, and the Ollama script if present.
+    """
+    keyed_scripts = []
+    if API_KEYS["OPENAI"]:
+        keyed_scripts.append(LLM_DIR / "oai.py")
+    if API_KEYS["ANTHROPIC"]:
+        keyed_scripts.append(LLM_DIR / "anth.py")
+    
+    ollama_script = LLM_DIR / "ollama.py"
+    return (tuple(script for script in keyed_scripts if script.exists()),
+            ollama_script if ollama_script.exists() else None)
+
+
+def get_llm_scripts() -> List[Path]:
+    """
+    Return the LLM helper scripts to try for a completion message.
+    Priority order: OpenAI > Anthropic > Ollama
+    """
+    keyed_scripts, ollama_script = get_installed_llm_scripts()
+    scripts = list(keyed_scripts)
+    
+    # Ollama is a local LLM and needs no API key, only a running server
+    if ollama_script and is_ollama_running():
+        scripts.append(ollama_script)
+    
+    return scripts
+
+
+def kill_process_tree(proc: subprocess.Popen):
+    """Kill a helper process along with any children it spawned (e.g. uv's interpreter)."""
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (OSError, ProcessLookupError):
+        pass
+
+
+def run_llm_script(script: Path, processes: List[subprocess.Popen],
+                   cancelled: threading.Event) -> Optional[str]:
+    """Run an LLM helper script and return its completion message, if any."""
+    module = load_helper_module(script, LLM_HTTP_TIMEOUT_ENV)
+    if module is not None:
         try:
-            result = subprocess.run([
-                "uv", "run", str(ollama_script), "--completion"
-            ], 
-            capture_output=True,
+            return module.generate_completion_message()
+        except ImportError:
+            pass  # Fall back to running the helper via uv
+    
+    try:
+        proc = subprocess.Popen(
+            ["uv", "run", str(script), "--completion"],
+            env={**os.environ, **LLM_HTTP_TIMEOUT_ENV},
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=10
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError):
-            pass
+            start_new_session=True
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    
+    processes.append(proc)
+    if cancelled.is_set():
+        # Another provider already answered while this one was starting
+        kill_process_tree(proc)
+    
+    try:
+        stdout, _ = proc.communicate(timeout=LLM_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        kill_process_tree(proc)
+        proc.communicate()
+        return None
+    
+    if proc.returncode == 0 and stdout.strip():
+        return stdout.strip()
+    return None
+
+
+def generate_llm_completion_message(scripts: List[Path]) -> Optional[str]:
+    """
+    Generate completion message using the given LLM helper scripts.
+    All providers are queried concurrently and the first successful answer
+    within LLM_TIMEOUT wins; providers finishing together are ranked
+    OpenAI > Anthropic > Ollama.
+    
+    Returns:
+        str: Generated completion message, or None if no service responded
+    """
+    if not scripts:
+        return None
+    
+    processes: List[subprocess.Popen] = []
+    cancelled = threading.Event()
+    results = queue.Queue()
+    
+    def run(index: int, script: Path):
+        try:
+            message = run_llm_script(script, processes, cancelled)
+        except Exception:
+            message = None
+        results.put((index, message))
+    
+    # Daemon threads: an in-process provider call cannot be cancelled, so a slow
+    # one is abandoned at the deadline instead of being joined at interpreter exit
+    for index, script in enumerate(scripts):
+        threading.Thread(target=run, args=(index, script), daemon=True).start()
     
-    # Fallback to random predefined message
-    messages = get_completion_messages()
-    return random.choice(messages)
+    deadline = time.monotonic() + LLM_TIMEOUT
+    try:
+        remaining = len(scripts)
+        while remaining:
+            try:
+                finished = [results.get(timeout=max(deadline - time.monotonic(), 0))]
+            except queue.Empty:
+                return None
+            while True:
+                try:
+                    finished.append(results.get_nowait())
+                except queue.Empty:
+                    break
+            remaining -= len(finished)
+            
+            # Preserve priority order among providers finishing together
+            answers = sorted((index, message) for index, message in finished if message)
+            if answers:
+                return answers[0][1]
+        return None
+    finally:
+        # Stop the providers that are still running
+        cancelled.set()
+        for proc in processes:
+            if proc.poll() is None:
+                kill_process_tree(proc)
+
+
+def speak_in_process(module, message: str) -> bool:
+    """
+    Call a TTS helper's speak() within TTS_TIMEOUT.
+    The call runs on a daemon thread, like the in-process LLM providers, so a
+    stalled one is abandoned at the timeout rather than holding up the hook.
+    
+    Returns:
+        bool: False if the helper's SDK turned out to be missing, in which case
+        the caller falls back to `uv run`
+    """
+    results = queue.Queue()
+    
+    def run():
+        try:
+            module.speak(message)
+            results.put(None)
+        except Exception as e:
+            results.put(e)
+    
+    threading.Thread(target=run, daemon=True).start()
+    try:
+        error = results.get(timeout=TTS_TIMEOUT)
+    except queue.Empty:
+        return True  # Given up on, as a `uv run` past its timeout would be
+    return not isinstance(error, ImportError)
+
 
 def announce_completion(enable_insights: bool = False, insights_detail: str = "medium"):
     """Announce completion using the best available TTS service."""
     try:
+        # Resolve TTS first so no LLM call is paid for when nothing can speak it
         tts_script = get_tts_script_path()
         if not tts_script:
             return  # No TTS scripts available
         
-        # Get completion message (LLM-generated or fallback)
-        completion_message = get_llm_completion_message()
-        
-        # Generate learning insights if enabled
         if enable_insights:
-            insights = generate_learning_insights(detail_level=insights_detail)
+            # The LLM call and git analysis are independent; run them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                message_future = executor.submit(get_llm_completion_message)
+                insights_future = executor.submit(generate_learning_insights, ".", insights_detail)
+                completion_message = message_future.result()
+                insights = insights_future.result()
+            
             if insights:
                 # Combine completion message with insights
                 full_message = f"{completion_message} {insights}"
             else:
                 full_message = completion_message
         else:
-            full_message = completion_message
+            # Get completion message (LLM-generated or fallback)
+            full_message = get_llm_completion_message()
+        
+        # Speak the full message in-process when possible
+        module = load_helper_module(tts_script, HTTP_TIMEOUT_ENV)
+        if module is not None and speak_in_process(module, full_message):
+            return
         
         # Call the TTS script with the full message
         subprocess.run([
             "uv", "run", tts_script, full_message
         ], 
+        env={**os.environ, **HTTP_TIMEOUT_ENV},
         capture_output=True,  # Suppress output
-        timeout=20  # Increased timeout for longer messages
+        timeout=TTS_TIMEOUT  # Increased timeout for longer messages
         )
         
     except (subprocess.TimeoutExpired, subprocess.SubprocessError, FileNotFoundError):
@@ -169,6 +492,212 @@ def announce_completion(enable_insights: bool = False, insights_detail: str = "m
         pass
 
 
+# Marker files identifying a project's type, in priority order
+PROJECT_TYPE_MARKERS = {
+    "package.json": "JavaScript/Node.js",
+    "tsconfig.json": "TypeScript",
+    "requirements.txt": "Python",
+    "pyproject.toml": "Python", 
+    "setup.py": "Python",
+    "go.mod": "Go",
+    "Cargo.toml": "Rust",
+    "pom.xml": "Java",
+    "Gemfile": "Ruby",
+}
+
+# Detected project types by absolute repository path
+_project_types: Dict[str, str] = {}
+
+# Patterns for new functions/classes in added diff lines, by project type
+FUNCTION_PATTERNS: Dict[str, List[Tuple[re.Pattern, str]]] = {
+    "Python": [
+        (re.compile(r"^\+.*(?:async\s+)?def\s+(\w+)\s*\(.*?\):"), "function"),
+        (re.compile(r"^\+.*class\s+(\w+)\s*[\(:]"), "class"),
+    ],
+    "JavaScript/Node.js": [
+        (re.compile(r"^\+.*function\s+(\w+)\s*\("), "function"),
+        (re.compile(r"^\+.*const\s+(\w+)\s*=.*=>"), "function"),
+    ],
+    "TypeScript": [
+        (re.compile(r"^\+.*function\s+(\w+)\s*\("), "function"),
+        (re.compile(r"^\+.*const\s+(\w+)\s*=.*=>"), "function"),
+        (re.compile(r"^\+.*interface\s+(\w+)\s*\{"), "interface"),
+    ],
+}
+
+# Patterns for new imports/dependencies in a diff, by project type
+IMPORT_PATTERNS: Dict[str, List[re.Pattern]] = {
+    "Python": [
+        re.compile(r"^\+\s*import\s+(\w+)", re.MULTILINE),
+        re.compile(r"^\+\s*from\s+(\w+)", re.MULTILINE),
+    ],
+    "JavaScript/Node.js": [
+        re.compile(r"^\+\s*import.*from\s+['\"]([^'\"]+)['\"]", re.MULTILINE),
+        re.compile(r"^\+\s*const\s+.*=\s+require\(['\"]([^'\"]+)['\"]\)", re.MULTILINE),
+    ],
+    "TypeScript": [
+        re.compile(r"^\+\s*import.*from\s+['\"]([^'\"]+)['\"]", re.MULTILINE),
+    ],
+}
+
+
+def build_diff_regex(project_type: str) -> Tuple[re.Pattern, Dict[str, Tuple[str, str, int]]]:
+    """
+    Fuse a project type's function and import patterns into one alternation.
+    Each pattern is wrapped in a named group so a match can be routed via
+    `match.lastgroup` to (kind, label, index of the captured name).
+    """
+    sources = [(pattern.pattern, "function", label)
+               for pattern, label in FUNCTION_PATTERNS.get(project_type, [])]
+    sources += [(pattern.pattern, "import", "import")
+                for pattern in IMPORT_PATTERNS.get(project_type, [])]
+    
+    # Every pattern starts with the added-line anchor; hoist it out of the
+    # alternation so non-matching positions fail on the first character
+    prefix = "^\\+"
+    regex = re.compile(
+        prefix + "(?:" + "|".join(
+            f"(?P<g{i}>{source[len(prefix):]})" for i, (source, _, _) in enumerate(sources)
+        ) + ")",
+        re.MULTILINE
+    )
+    routes = {
+        f"g{i}": (kind, label, regex.groupindex[f"g{i}"] + 1)
+        for i, (_, kind, label) in enumerate(sources)
+    }
+    return regex, routes
+
+
+# One fused regex per project type so the diff is scanned in a single pass
+DIFF_REGEXES = {project_type: build_diff_regex(project_type)
+                for project_type in FUNCTION_PATTERNS.keys() | IMPORT_PATTERNS.keys()}
+
+# Maximum number of unique functions and imports reported from a diff
+MAX_FUNCTIONS = 8
+MAX_IMPORTS = 5
+
+# Added diff lines are prefiltered with hyperscan in batches of this many lines
+HYPERSCAN_BATCH_LINES = 4096
+
+# Compiled hyperscan databases by project type (None if unavailable)
+_hyperscan_dbs = {}
+
+# Non-ASCII added lines the hyperscan prefilter must classify exactly like `re`
+HYPERSCAN_PROBE_LINES = (
+    "+def café_helper(x):",
+    "+    async def größe(self):",
+    "+class Ünit(Base):",
+    "+import numpy",
+    "+from données import x",
+    "+function grüße() {",
+    "+const naïve = () => 1",
+    "+interface Ñandú {",
+    "+import x from 'módulo'",
+    "+const m = require('módulo')",
+    "+x = 'ü'",
+    " def unchanged_é(x):",
+)
+
+
+def get_hyperscan_candidates(db, data: bytes) -> set:
+    """Return the indexes of the newline-separated lines in data that hyperscan matches."""
+    match_ends = []
+    db.scan(data, match_event_handler=lambda id, start, end, flags, context: match_ends.append(end))
+    
+    # Convert match end offsets to line numbers
+    candidates = set()
+    pos = line_number = 0
+    for end in sorted(set(match_ends)):
+        line_number += data.count(b"\n", pos, end - 1)
+        pos = end - 1
+        candidates.add(line_number)
+    return candidates
+
+
+def get_hyperscan_db(project_type: str):
+    """
+    Compile a project type's function and import patterns into a single
+    hyperscan database that matches all of them in one linear pass.
+    Returns None when hyperscan is not installed, cannot compile them, or
+    disagrees with the `re` patterns on HYPERSCAN_PROBE_LINES.
+    """
+    if hyperscan is None or project_type not in DIFF_REGEXES:
+        return None
+    if project_type in _hyperscan_dbs:
+        return _hyperscan_dbs[project_type]
+    
+    patterns = [pattern for pattern, _ in FUNCTION_PATTERNS.get(project_type, [])]
+    patterns += IMPORT_PATTERNS.get(project_type, [])
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[pattern.pattern.encode() for pattern in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            # UTF-8 + UCP so \w and \s are Unicode-aware, as they are in `re`
+            flags=[hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP]
+                  * len(patterns)
+        )
+        
+        # The prefilter must never drop a line the regex would match
+        regex = DIFF_REGEXES[project_type][0]
+        candidates = get_hyperscan_candidates(db, "\n".join(HYPERSCAN_PROBE_LINES).encode("utf-8"))
+        if any((index in candidates) != bool(regex.match(line))
+               for index, line in enumerate(HYPERSCAN_PROBE_LINES)):
+            db = None
+    except Exception:
+        db = None
+    
+    _hyperscan_dbs[project_type] = db
+    return db
+
+
+# File path patterns for configuration and test files
+CONFIG_FILE_PATTERN = re.compile(
+    r"\.json$|\.yaml$|\.yml$|\.toml$|\.ini$|\.env|config|settings", re.IGNORECASE
+)
+TEST_FILE_PATTERN = re.compile(
+    r"test_|_test\.|\.test\.|spec\.|\.spec\.|/tests?/|/spec/|/__tests__/", re.IGNORECASE
+)
+
+
+# Function name prefixes and the purpose they imply ({rest} is the name after the prefix)
+NAME_PREFIX_PATTERN = re.compile(r"(get|set|is|has|create|update|delete|test)_(.*)", re.DOTALL)
+NAME_PREFIX_PURPOSES = {
+    "get": "retrieves {rest}",
+    "set": "sets {rest}",
+    "is": "checks {name}",
+    "has": "checks {name}",
+    "create": "creates {rest}",
+    "update": "updates {rest}",
+    "delete": "deletes {rest}",
+    "test": "tests {rest}",
+}
+
+# Keywords anywhere in a function name and the purpose they imply, in priority order
+NAME_KEYWORD_PURPOSES = (
+    (("_test",), "test function"),
+    (("init",), "initialization"),
+    (("main",), "main entry point"),
+    (("format",), "formatting utility"),
+    (("analyze", "analysis"), "analyzes data"),
+    (("service",), "service class"),
+)
+
+
+# File name and path hints used to describe why a file changed
+CONFIG_FILENAMES = frozenset({'package.json', 'tsconfig.json', 'pyproject.toml', '.env', 'docker-compose.yml'})
+DOC_SUFFIXES = ('.md', '.txt', '.rst')
+CODE_SUFFIXES = ('.py', '.js', '.ts', '.jsx', '.tsx')
+CODE_PATH_PURPOSES = (
+    (('component',), "UI component"),
+    (('util', 'helper'), "utility function"),
+    (('hook',), "hook functionality"),
+    (('api', 'route'), "API endpoint"),
+    (('model',), "data model"),
+)
+
+
 @dataclass
 class ChangeAnalysis:
     """Represents analysis of code changes"""
@@ -206,57 +735,100 @@ class GitRepository:
         except (subprocess.CalledProcessError, FileNotFoundError):
             return ""
     
-    def get_diff_content(self, commits_back: int = 1) -> str:
-        """Get diff content for recent changes"""
-        return self._run_git_command(["diff", f"HEAD~{commits_back}", "--no-color"])
+    def _popen_git_command(self, cmd: List[str]) -> Optional[subprocess.Popen]:
+        """Start a git command with its output streamed through a pipe"""
+        try:
+            return subprocess.Popen(
+                ["git"] + cmd,
+                cwd=self.repo_path,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=1 << 16
+            )
+        except OSError:
+            return None
     
-    def get_file_changes(self, commits_back: int = 1) -> Tuple[List[str], List[str], List[str]]:
-        """Get file changes with status"""
-        diff_output = self._run_git_command(["diff", "--name-status", f"HEAD~{commits_back}"])
-        
-        files_changed, files_added, files_deleted = [], [], []
-        
-        for line in diff_output.split("\n"):
-            if not line:
-                continue
-            parts = line.split("\t", 1)
-            if len(parts) < 2:
-                continue
-            status, filename = parts[0], parts[1]
-            
-            if status == "A":
-                files_added.append(filename)
-            elif status == "D":
-                files_deleted.append(filename)
-            else:
-                files_changed.append(filename)
-        
-        return files_changed, files_added, files_deleted
+    def _iter_added_lines(self, proc: subprocess.Popen) -> Iterator[Optional[str]]:
+        """
+        Yield the added lines of a streamed unified diff, decoding only those.
+        Any other line (context, removal, hunk or file header) yields a single
+        None marking a boundary between runs of added lines.
+        """
+        prev_is_old_header = False
+        at_boundary = True
+        for line in proc.stdout:
+            if line.startswith(b"+") and not (prev_is_old_header and line.startswith(b"+++ ")):
+                yield line.rstrip(b"\n").decode("utf-8", "replace")
+                at_boundary = False
+            elif not at_boundary:
+                yield None
+                at_boundary = True
+            prev_is_old_header = line.startswith(b"--- ")
     
-    def get_line_stats(self, commits_back: int = 1) -> Tuple[int, int]:
-        """Get line addition/deletion statistics"""
-        stat_output = self._run_git_command(["diff", "--numstat", f"HEAD~{commits_back}"])
-        
+    @contextlib.contextmanager
+    def get_all_changes(self, commits_back: int = 1, with_patch: bool = True) -> Iterator[Tuple[List[str], List[str], List[str], int, int, Iterator[Optional[str]]]]:
+        """
+        Get file changes, line statistics and the added diff lines from a single
+        streamed git call. Used as a context manager: the added lines are a lazy
+        iterator, with None marking each break between runs of added lines, that
+        is only valid inside the block. The git process is stopped on exit.
+        Without with_patch no diff is requested and the iterator is empty.
+        """
+        files_changed, files_added, files_deleted = [], [], []
         total_additions = total_deletions = 0
-        for line in stat_output.split("\n"):
-            if not line:
-                continue
-            parts = line.split("\t")
-            if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
-                total_additions += int(parts[0])
-                total_deletions += int(parts[1])
         
-        return total_additions, total_deletions
+        proc = self._popen_git_command(
+            ["diff", f"HEAD~{commits_back}", "--raw", "--numstat"]
+            + (["-p"] if with_patch else []) + ["--no-color"]
+        )
+        if proc is None:
+            yield files_changed, files_added, files_deleted, 0, 0, iter(())
+            return
+        
+        try:
+            # The raw and numstat sections are separated from the patch by a blank line
+            for raw_line in proc.stdout:
+                line = raw_line.rstrip(b"\n").decode("utf-8", "replace")
+                if not line:
+                    break
+                parts = line.split("\t")
+                if line.startswith(":"):
+                    # Raw line: ":<modes> <hashes> <status>\t<path>"
+                    if len(parts) < 2:
+                        continue
+                    status, filename = parts[0].rsplit(" ", 1)[-1], "\t".join(parts[1:])
+                    
+                    if status == "A":
+                        files_added.append(filename)
+                    elif status == "D":
+                        files_deleted.append(filename)
+                    else:
+                        files_changed.append(filename)
+                elif len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+                    # Numstat line: "<additions>\t<deletions>\t<path>"
+                    total_additions += int(parts[0])
+                    total_deletions += int(parts[1])
+            
+            yield (files_changed, files_added, files_deleted, total_additions, total_deletions,
+                   self._iter_added_lines(proc) if with_patch else iter(()))
+        finally:
+            # Stops git early when the caller did not read the whole diff
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
     
     def get_commit_messages(self, commits_back: int = 1) -> List[str]:
         """Get recent commit messages"""
-        commit_output = self._run_git_command(["log", f"-{commits_back}", "--oneline", "--no-merges"])
+        # Subjects only, NUL-separated, so no SHA prefix needs splitting off
+        commit_output = self._run_git_command(
+            ["log", f"-{commits_back}", "--no-merges", "-z", "--format=%s"]
+        )
         
         if not commit_output:
             return []
         
-        return [line.split(" ", 1)[1] if len(line.split(" ", 1)) > 1 else "" 
-                for line in commit_output.split("\n") if line]
+        return commit_output.rstrip("\x00").split("\x00")
 
 
 class ProjectAnalyzer:
@@ -267,23 +839,24 @@ class ProjectAnalyzer:
         self.project_type = self._detect_project_type()
         
     def _detect_project_type(self) -> str:
-        """Detect the primary project type"""
-        detectors = {
-            "package.json": "JavaScript/Node.js",
-            "tsconfig.json": "TypeScript",
-            "requirements.txt": "Python",
-            "pyproject.toml": "Python", 
-            "setup.py": "Python",
-            "go.mod": "Go",
-            "Cargo.toml": "Rust",
-            "pom.xml": "Java",
-            "Gemfile": "Ruby",
-        }
-        
-        for file, proj_type in detectors.items():
-            if (self.git_repo.repo_path / file).exists():
-                return proj_type
-        return "Unknown"
+        """Detect the primary project type (memoized per repository path)"""
+        repo_path = os.path.abspath(self.git_repo.repo_path)
+        if repo_path in _project_types:
+            return _project_types[repo_path]
+        
+        # One directory read instead of a stat() per marker file
+        try:
+            with os.scandir(repo_path) as it:
+                entries = {entry.name for entry in it}
+        except OSError:
+            entries = set()
+        
+        project_type = next(
+            (proj_type for file, proj_type in PROJECT_TYPE_MARKERS.items() if file in entries),
+            "Unknown"
+        )
+        _project_types[repo_path] = project_type
+        return project_type
     
     def get_recent_changes(self, commits_back: int = 1) -> ChangeAnalysis:
         """Analyze recent changes in the repository"""
@@ -291,18 +864,14 @@ class ProjectAnalyzer:
             # Get commit messages
             commit_messages = self.git_repo.get_commit_messages(commits_back)
             
-            # Get file changes
-            files_changed, files_added, files_deleted = self.git_repo.get_file_changes(commits_back)
-            
-            # Get line statistics
-            total_additions, total_deletions = self.git_repo.get_line_stats(commits_back)
-            
-            # Get diff content for analysis
-            diff_content = self.git_repo.get_diff_content(commits_back)
-            
-            # Analyze code changes
-            key_functions_changed = self._analyze_function_changes(diff_content)
-            imports_added = self._analyze_import_changes(diff_content)
+            # Get file changes, line statistics and added lines in one git call;
+            # the diff itself is only needed when there are patterns to scan it for
+            with self.git_repo.get_all_changes(
+                commits_back, with_patch=self.project_type in DIFF_REGEXES
+            ) as (files_changed, files_added, files_deleted,
+                  total_additions, total_deletions, added_lines):
+                # Analyze code changes
+                key_functions_changed, imports_added = self._analyze_code_changes(added_lines)
             config_changes = self._analyze_config_changes(files_changed + files_added)
             test_changes = self._analyze_test_changes(files_changed + files_added)
             
@@ -322,70 +891,131 @@ class ProjectAnalyzer:
             # Return empty analysis as fallback
             return ChangeAnalysis([], [], [], 0, 0, [], [], [], [], [])
     
-    def _analyze_function_changes(self, diff_content: str) -> List[str]:
-        """Detect function/method changes with context"""
-        functions_with_context = []
-        patterns = {
-            "Python": [
-                (r"^\+.*(?:async\s+)?def\s+(\w+)\s*\(.*?\):", "function"),
-                (r"^\+.*class\s+(\w+)\s*[\(:]", "class")
-            ],
-            "JavaScript/Node.js": [
-                (r"^\+.*function\s+(\w+)\s*\(", "function"),
-                (r"^\+.*const\s+(\w+)\s*=.*=>", "function"),
-            ],
-            "TypeScript": [
-                (r"^\+.*function\s+(\w+)\s*\(", "function"),
-                (r"^\+.*const\s+(\w+)\s*=.*=>", "function"),
-                (r"^\+.*interface\s+(\w+)\s*{", "interface"),
-            ],
-        }
-        
-        project_patterns = patterns.get(self.project_type, [])
-        
-        # Split diff into lines for context analysis
-        lines = diff_content.split('\n')
-        
-        for i, line in enumerate(lines):
-            if not line.startswith('+'):
+    def _analyze_code_changes(self, added_lines: Iterable[Optional[str]]) -> Tuple[List[str], List[str]]:
+        """
+        Detect function/method changes with context and new imports in one pass.
+        A None in added_lines marks a hunk or file boundary that context lookups
+        never cross. Scanning stops as soon as enough unique functions and imports are found.
+        """
+        functions_with_context, seen_functions = [], set()
+        imports, seen_imports = [], set()
+        
+        if self.project_type not in DIFF_REGEXES:
+            return functions_with_context, imports
+        regex, routes = DIFF_REGEXES[self.project_type]
+        
+        # Project types without import patterns never need to wait for imports
+        max_imports = MAX_IMPORTS if any(kind == "import" for kind, _, _ in routes.values()) else 0
+        
+        # Functions wait here until the 4 lines after them (for docstrings) are seen
+        pending = []
+        
+        def add_function(name: str, label: str, lines: List[str], index: int):
+            # Look for docstring or comment around the definition
+            purpose = self._extract_function_purpose(lines, index, name)
+            entry = f"{name} ({purpose or label})"
+            if entry not in seen_functions and len(functions_with_context) < MAX_FUNCTIONS:
+                seen_functions.add(entry)
+                functions_with_context.append(entry)
+        
+        def add_import(name: str):
+            # Clean up import names
+            cleaned = name.split('/')[-1].split('.')[0]
+            if cleaned and not cleaned.startswith('.') and cleaned not in seen_imports:
+                if len(imports) < MAX_IMPORTS:
+                    seen_imports.add(cleaned)
+                    imports.append(cleaned)
+        
+        line_matches = self._iter_line_matches(regex, added_lines)
+        prev_line = None
+        for line, match in line_matches:
+            if line is None:
+                # Lines past a boundary belong to unrelated code
+                for entry in pending:
+                    add_function(*entry)
+                pending.clear()
+                prev_line = None
                 continue
-                
-            for pattern, func_type in project_patterns:
-                match = re.search(pattern, line)
-                if match:
-                    func_name = match.group(1)
-                    # Look for docstring or comment above
-                    purpose = self._extract_function_purpose(lines, i, func_name)
-                    if purpose:
-                        functions_with_context.append(f"{func_name} ({purpose})")
-                    else:
-                        functions_with_context.append(f"{func_name} ({func_type})")
+            
+            for name, label, lines, index in pending:
+                lines.append(line)
+            while pending and len(pending[0][2]) - pending[0][3] > 4:
+                add_function(*pending.pop(0))
+            
+            if len(functions_with_context) >= MAX_FUNCTIONS and len(imports) >= max_imports:
+                break  # Nothing more to collect; skip the rest of the diff
+            
+            if match:
+                kind, label, name_group = routes[match.lastgroup]
+                name = match.group(name_group)
+                if kind == "import":
+                    add_import(name)
+                else:
+                    lines = [prev_line, line] if prev_line is not None else [line]
+                    pending.append((name, label, lines, len(lines) - 1))
+            
+            prev_line = line
+        else:
+            for entry in pending:
+                add_function(*entry)
         
-        return list(dict.fromkeys(functions_with_context))[:8]  # Unique functions, increased limit
+        return functions_with_context, imports
+    
+    def _iter_line_matches(self, regex: re.Pattern,
+                           added_lines: Iterable[Optional[str]]) -> Iterator[Tuple[Optional[str], Optional[re.Match]]]:
+        """
+        Yield each added line with its fused regex match (or None); boundary
+        markers pass through unmatched. With hyperscan, lines are scanned in
+        batches and the regex only runs on lines known to match.
+        """
+        db = get_hyperscan_db(self.project_type)
+        if db is None:
+            for line in added_lines:
+                yield line, regex.match(line) if line is not None else None
+            return
+        
+        added_lines = iter(added_lines)
+        while True:
+            batch = list(islice(added_lines, HYPERSCAN_BATCH_LINES))
+            if not batch:
+                return
+            
+            # Lines are decoded with errors="replace", so this is always valid UTF-8
+            candidates = get_hyperscan_candidates(
+                db, "\n".join(line or "" for line in batch).encode("utf-8")
+            )
+            
+            for line_number, line in enumerate(batch):
+                yield line, regex.match(line) if line_number in candidates else None
     
     def _extract_function_purpose(self, lines: List[str], func_line_index: int, func_name: str) -> Optional[str]:
         """Extract the purpose of a function from docstring or comments"""
         # Look for docstring in the next few lines
-        if func_line_index + 1 < len(lines):
-            for j in range(func_line_index + 1, min(func_line_index + 5, len(lines))):
-                line = lines[j].strip()
-                if line.startswith('+'):
-                    line = line[1:].strip()
-                    # Check for docstring
-                    if line.startswith('"""') or line.startswith("'''"):
-                        # Extract first line of docstring
-                        docstring = line.strip('"""').strip("'''").strip()
-                        if docstring and not docstring.startswith(func_name):
-                            return docstring[:50]  # Limit length
-                    # Check for comment
-                    elif j == func_line_index + 1 and line.startswith('#'):
-                        return line[1:].strip()[:50]
-        
-        # Look for comment on the same line or above
+        for j in range(func_line_index + 1, min(func_line_index + 5, len(lines))):
+            line = lines[j]
+            if not line.startswith('+'):
+                continue
+            stripped = line[1:].strip()
+            
+            # Check for docstring
+            if stripped.startswith(('"""', "'''")):
+                # Extract first line of docstring, dropping its quotes
+                quote = stripped[:3]
+                docstring = stripped[3:]
+                if docstring.endswith(quote):
+                    docstring = docstring[:-3]
+                docstring = docstring.strip()
+                if docstring and not docstring.startswith(func_name):
+                    return docstring[:50]  # Limit length
+            # Check for comment
+            elif j == func_line_index + 1 and stripped.startswith('#'):
+                return stripped[1:].strip()[:50]
+        
+        # Look for comment on the line above
         if func_line_index > 0:
-            prev_line = lines[func_line_index - 1].strip()
+            prev_line = lines[func_line_index - 1]
             if prev_line.startswith('+') and '#' in prev_line:
-                comment = prev_line[prev_line.index('#')+1:].strip()
+                comment = prev_line[prev_line.index('#') + 1:].strip()
                 if comment:
                     return comment[:50]
         
@@ -396,98 +1026,27 @@ class ProjectAnalyzer:
         """Infer function purpose from its name"""
         name_lower = func_name.lower()
         
-        # Common patterns
-        if name_lower.startswith('get_'):
-            return f"retrieves {name_lower[4:].replace('_', ' ')}"
-        elif name_lower.startswith('set_'):
-            return f"sets {name_lower[4:].replace('_', ' ')}"
-        elif name_lower.startswith('is_') or name_lower.startswith('has_'):
-            return f"checks {name_lower.replace('_', ' ')}"
-        elif name_lower.startswith('create_'):
-            return f"creates {name_lower[7:].replace('_', ' ')}"
-        elif name_lower.startswith('update_'):
-            return f"updates {name_lower[7:].replace('_', ' ')}"
-        elif name_lower.startswith('delete_'):
-            return f"deletes {name_lower[7:].replace('_', ' ')}"
-        elif name_lower.startswith('test_'):
-            return f"tests {name_lower[5:].replace('_', ' ')}"
-        elif '_test' in name_lower:
-            return "test function"
-        elif 'init' in name_lower:
-            return "initialization"
-        elif 'main' in name_lower:
-            return "main entry point"
-        elif 'format' in name_lower:
-            return "formatting utility"
-        elif 'analyze' in name_lower or 'analysis' in name_lower:
-            return "analyzes data"
-        elif 'service' in name_lower:
-            return "service class"
+        # Common prefixes, dispatched with one regex match and a dict lookup
+        match = NAME_PREFIX_PATTERN.match(name_lower)
+        if match:
+            return NAME_PREFIX_PURPOSES[match.group(1)].format(
+                name=name_lower.replace('_', ' '),
+                rest=match.group(2).replace('_', ' ')
+            )
+        
+        for keywords, purpose in NAME_KEYWORD_PURPOSES:
+            if any(keyword in name_lower for keyword in keywords):
+                return purpose
         
         return None
     
-    def _analyze_import_changes(self, diff_content: str) -> List[str]:
-        """Detect new imports/dependencies"""
-        imports = []
-        patterns = {
-            "Python": [
-                r"^\+\s*import\s+(\w+)",
-                r"^\+\s*from\s+(\w+)"
-            ],
-            "JavaScript/Node.js": [
-                r"^\+\s*import.*from\s+['\"]([^'\"]+)['\"]",
-                r"^\+\s*const\s+.*=\s+require\(['\"]([^'\"]+)['\"]\)"
-            ],
-            "TypeScript": [
-                r"^\+\s*import.*from\s+['\"]([^'\"]+)['\"]",
-            ],
-        }
-        
-        project_patterns = patterns.get(self.project_type, [])
-        for pattern in project_patterns:
-            matches = re.findall(pattern, diff_content, re.MULTILINE)
-            imports.extend(matches)
-        
-        # Clean up import names
-        clean_imports = []
-        for imp in imports:
-            cleaned = imp.split('/')[-1].split('.')[0]
-            if cleaned and not cleaned.startswith('.'):
-                clean_imports.append(cleaned)
-        
-        return list(set(clean_imports))[:5]
-    
     def _analyze_config_changes(self, files: List[str]) -> List[str]:
         """Detect configuration file changes"""
-        config_files = []
-        config_patterns = [
-            r'\.json$', r'\.yaml$', r'\.yml$', r'\.toml$', r'\.ini$', 
-            r'\.env', r'config', r'settings'
-        ]
-        
-        for file in files:
-            for pattern in config_patterns:
-                if re.search(pattern, file, re.IGNORECASE):
-                    config_files.append(file)
-                    break
-        
-        return config_files
+        return [file for file in files if CONFIG_FILE_PATTERN.search(file)]
     
     def _analyze_test_changes(self, files: List[str]) -> List[str]:
         """Detect test file changes"""
-        test_files = []
-        test_patterns = [
-            r'test_', r'_test\.', r'\.test\.', r'spec\.', r'\.spec\.',
-            r'/tests?/', r'/spec/', r'/__tests__/'
-        ]
-        
-        for file in files:
-            for pattern in test_patterns:
-                if re.search(pattern, file, re.IGNORECASE):
-                    test_files.append(file)
-                    break
-        
-        return test_files
+        return [file for file in files if TEST_FILE_PATTERN.search(file)]
 
 
 class LearningInsightGenerator:
@@ -641,7 +1200,7 @@ class LearningInsightGenerator:
         )
         
         for filepath, action in all_files:
-            filename = Path(filepath).name
+            filename = os.path.basename(filepath)
             purpose = self._infer_file_purpose(filepath, action)
             file_purposes[filename] = purpose
         
@@ -649,12 +1208,11 @@ class LearningInsightGenerator:
     
     def _infer_file_purpose(self, filepath: str, action: str) -> str:
         """Infer the purpose of a file change based on its path and type"""
-        path = Path(filepath)
-        filename = path.name
-        path_parts = path.parts
+        filename = os.path.basename(filepath)
+        path_lower = filepath.lower()
         
         # Check if it's a test file
-        if any(pattern in str(path).lower() for pattern in ['test', 'spec', '__tests__']):
+        if 'test' in path_lower or 'spec' in path_lower:
             if action == 'created':
                 return "added test coverage"
             elif action == 'modified':
@@ -663,33 +1221,26 @@ class LearningInsightGenerator:
                 return "removed test"
         
         # Check if it's a config file
-        if filename in ['package.json', 'tsconfig.json', 'pyproject.toml', '.env', 'docker-compose.yml']:
+        if filename in CONFIG_FILENAMES:
             return f"{action} project configuration"
         
         # Check for specific file types
-        if filename.endswith(('.md', '.txt', '.rst')):
+        if filename.endswith(DOC_SUFFIXES):
             return f"{action} documentation"
         
-        if filename.endswith(('.py', '.js', '.ts', '.jsx', '.tsx')):
+        if filename.endswith(CODE_SUFFIXES):
             # Look for clues in the path
-            if 'component' in str(path).lower():
-                return f"{action} UI component"
-            elif 'util' in str(path).lower() or 'helper' in str(path).lower():
-                return f"{action} utility function"
-            elif 'hook' in str(path).lower():
-                return f"{action} hook functionality"
-            elif 'api' in str(path).lower() or 'route' in str(path).lower():
-                return f"{action} API endpoint"
-            elif 'model' in str(path).lower():
-                return f"{action} data model"
+            for keywords, purpose in CODE_PATH_PURPOSES:
+                if any(keyword in path_lower for keyword in keywords):
+                    return f"{action} {purpose}"
+            
+            # Check for specific function changes
+            if filename in self.analysis.key_functions_changed:
+                return f"{action} with new functions"
+            elif self.analysis.imports_added and action == 'modified':
+                return "added new dependencies"
             else:
-                # Check for specific function changes
-                if filename in self.analysis.key_functions_changed:
-                    return f"{action} with new functions"
-                elif self.analysis.imports_added and action == 'modified':
-                    return "added new dependencies"
-                else:
-                    return f"{action} implementation"
+                return f"{action} implementation"
         
         # Default based on action
         if action == 'created':
@@ -720,72 +1271,206 @@ def generate_learning_insights(repo_path: str = ".", detail_level: str = "medium
         return None
 
 
+def compact_stop_logs(log_dir: str):
+    """
+    Merge entries appended to logs/stop.jsonl into the logs/stop.json array.
+    The JSONL file is moved aside first so hooks running meanwhile keep appending safely.
+    """
+    jsonl_path = os.path.join(log_dir, "stop.jsonl")
+    json_path = os.path.join(log_dir, "stop.json")
+    compacting_path = jsonl_path + ".compacting"
+    
+    if os.path.exists(jsonl_path):
+        os.replace(jsonl_path, compacting_path)
+    if not os.path.exists(compacting_path):
+        return
+    
+    # Read existing log data or initialize empty list
+    log_data = []
+    if os.path.exists(json_path):
+        with open(json_path, 'rb') as f:
+            try:
+                log_data = json_loads(f.read())
+            except (json.JSONDecodeError, ValueError):
+                log_data = []
+    
+    with open(compacting_path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    log_data.append(json_loads(line))
+                except json.JSONDecodeError:
+                    pass  # Skip invalid lines
+    
+    # Write back to file with formatting
+    write_atomically(json_path, json_dumps(log_data, indent=True))
+    os.remove(compacting_path)
+
+
+# Top-level record types kept in chat.json
+CHAT_RECORD_TYPES = frozenset({"user", "assistant"})
+
+# Raw byte markers of those types; a line without one is never parsed. They may
+# also occur in nested objects, so parsed records are still checked by type.
+_INTERESTING_TOKENS = (
+    b'"type":"user"',
+    b'"type":"assistant"',
+    b'"type": "user"',
+    b'"type": "assistant"',
+)
+
+
+def iter_jsonl_records(data, start: int = 0, end: Optional[int] = None) -> Iterator:
+    """Yield parsed user/assistant records from data[start:end], skipping all other lines."""
+    if end is None:
+        end = len(data)
+    while start < end:
+        newline = data.find(b'\n', start, end)
+        if newline == -1:
+            newline = end
+        line = data[start:newline].strip()
+        start = newline + 1
+        # Cheap substring check so irrelevant lines are never parsed
+        if not any(token in line for token in _INTERESTING_TOKENS):
+            continue
+        try:
+            record = json_loads(line)
+        except json.JSONDecodeError:
+            continue  # Skip invalid lines
+        if isinstance(record, dict) and record.get("type") in CHAT_RECORD_TYPES:
+            yield record
+
+
+def _write_sidecar(path: str, content: str):
+    """Atomically replace a small bookkeeping file in the log directory."""
+    write_atomically(path, content.encode())
+
+
+def _read_sidecar(path: str) -> str:
+    """Read a bookkeeping file, returning an empty string if it is missing."""
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def write_chat_log(transcript_path: str, log_dir: str):
+    """
+    Convert the .jsonl transcript into a JSON array at logs/chat.json.
+    Only records whose top-level type is in CHAT_RECORD_TYPES (user and assistant
+    messages) are kept; summary, system and other records are dropped.
+    Skipped when the transcript is unchanged since the last conversion (logs/.chat_stamp);
+    otherwise only the lines appended after the offset in logs/.chat_offset are parsed.
+    """
+    chat_file = os.path.join(log_dir, 'chat.json')
+    stamp_file = os.path.join(log_dir, '.chat_stamp')
+    offset_file = os.path.join(log_dir, '.chat_offset')
+    st = os.stat(transcript_path)
+    stamp = f"{st.st_mtime_ns}:{st.st_size}:{transcript_path}"
+    chat_exists = os.path.exists(chat_file)
+    if chat_exists and _read_sidecar(stamp_file) == stamp:
+        return
+    
+    # Resume after the last processed line if this is the same, still-growing transcript
+    offset, _, offset_path = _read_sidecar(offset_file).partition(":")
+    offset = int(offset) if offset.isdigit() else 0
+    chat_data = []
+    resumed = offset_path == transcript_path and 0 < offset <= st.st_size and chat_exists
+    if resumed:
+        try:
+            with open(chat_file, 'rb') as f:
+                chat_data = json_loads(f.read())
+        except (json.JSONDecodeError, ValueError):
+            chat_data = None
+        if not isinstance(chat_data, list):
+            chat_data, offset, resumed = [], 0, False
+    else:
+        offset = 0
+    
+    with open(transcript_path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            data = b''  # Empty files cannot be mapped
+        try:
+            # Stop at the last complete line; a partially written one is picked up next time
+            end = data.rfind(b'\n', offset) + 1 or offset
+            chat_data.extend(iter_jsonl_records(data, offset, end))
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    
+    # Write to logs/chat.json atomically so readers never see a partial file
+    if end > offset or not resumed:
+        write_atomically(chat_file, json_dumps(chat_data))
+    
+    # Record what was converted so later hooks can skip or resume the work
+    _write_sidecar(offset_file, f"{end}:{transcript_path}")
+    _write_sidecar(stamp_file, stamp)
+
+
+def write_chat_log_quietly(transcript_path: str, log_dir: str):
+    """Run write_chat_log, ignoring failures (background thread target)."""
+    try:
+        write_chat_log(transcript_path, log_dir)
+    except Exception:
+        pass  # Fail silently
+
+
 def main():
     try:
         # Parse command line arguments
         parser = argparse.ArgumentParser()
-        parser.add_argument('--chat', action='store_true', help='Copy transcript to chat.json')
+        parser.add_argument('--chat', action='store_true', help='Copy the user/assistant messages from the transcript to chat.json')
         parser.add_argument('--notify', action='store_true', help='Enable TTS completion announcement')
         parser.add_argument('--insights', action='store_true', help='Enable learning insights analysis')
         parser.add_argument('--insights-detail', choices=['low', 'medium', 'high'], default='medium',
                            help='Detail level for learning insights (default: medium)')
+        parser.add_argument('--compact-logs', action='store_true',
+                           help='Merge logs/stop.jsonl into the logs/stop.json array and exit')
         args = parser.parse_args()
         
+        # Ensure log directory exists
+        log_dir = os.path.join(os.getcwd(), "logs")
+        os.makedirs(log_dir, exist_ok=True)
+        
+        # Handle --compact-logs switch (offline maintenance, no hook input)
+        if args.compact_logs:
+            compact_stop_logs(log_dir)
+            sys.exit(0)
+        
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        input_data = json_loads(sys.stdin.buffer.read())
 
         # Extract required fields
         session_id = input_data.get("session_id", "")
         stop_hook_active = input_data.get("stop_hook_active", False)
 
-        # Ensure log directory exists
-        log_dir = os.path.join(os.getcwd(), "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        log_path = os.path.join(log_dir, "stop.json")
-
-        # Read existing log data or initialize empty list
-        if os.path.exists(log_path):
-            with open(log_path, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
-        
-        # Append new data
-        log_data.append(input_data)
+        # Append to the JSONL log; O(1) regardless of how many sessions were logged
+        log_path = os.path.join(log_dir, "stop.jsonl")
+        with open(log_path, 'ab', buffering=1 << 16) as f:
+            f.write(json_dumps(input_data) + b'\n')
         
-        # Write back to file with formatting
-        with open(log_path, 'w') as f:
-            json.dump(log_data, f, indent=2)
-        
-        # Handle --chat switch
+        # Handle --chat switch in the background; the announcement does not depend on chat.json
+        chat_thread = None
         if args.chat and 'transcript_path' in input_data:
             transcript_path = input_data['transcript_path']
             if os.path.exists(transcript_path):
-                # Read .jsonl file and convert to JSON array
-                chat_data = []
-                try:
-                    with open(transcript_path, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line:
-                                try:
-                                    chat_data.append(json.loads(line))
-                                except json.JSONDecodeError:
-                                    pass  # Skip invalid lines
-                    
-                    # Write to logs/chat.json
-                    chat_file = os.path.join(log_dir, 'chat.json')
-                    with open(chat_file, 'w') as f:
-                        json.dump(chat_data, f, indent=2)
-                except Exception:
-                    pass  # Fail silently
-
-        # Announce completion via TTS (only if --notify flag is set)
-        if args.notify:
-            announce_completion(enable_insights=args.insights, insights_detail=args.insights_detail)
+                chat_thread = threading.Thread(
+                    target=write_chat_log_quietly, args=(transcript_path, log_dir), daemon=True
+                )
+                chat_thread.start()
+
+        try:
+            # Announce completion via TTS (only if --notify flag is set)
+            if args.notify:
+                announce_completion(enable_insights=args.insights, insights_detail=args.insights_detail)
+        finally:
+            # Let the conversion finish before the process exits
+            if chat_thread is not None:
+                chat_thread.join()
 
         sys.exit(0)
 
@@ -12,6 +12,31 @@ import sys
 from dotenv import load_dotenv
 
 
+# HTTP timeouts in seconds; stop.py sets HOOK_CONNECT_TIMEOUT / HOOK_READ_TIMEOUT
+CONNECT_TIMEOUT = float(os.getenv("HOOK_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("HOOK_READ_TIMEOUT", "7"))
+
+# Shared client so repeated in-process calls reuse pooled connections
+_client = None
+
+
+def get_client(api_key):
+    """Return the shared Anthropic client, creating it on first use."""
+    global _client
+    if _client is None:
+        import httpx
+        import anthropic
+
+        http_client = httpx.Client(
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        # No retries: one would only start after the read timeout, past stop.py's
+        # per-provider LLM_TIMEOUT; the hook races providers in parallel instead
+        _client = anthropic.Anthropic(api_key=api_key, http_client=http_client, max_retries=0)
+    return _client
+
+
 def prompt_llm(prompt_text):
     """
     Base Anthropic LLM prompting method using fastest model.
@@ -29,9 +54,7 @@ def prompt_llm(prompt_text):
         return None
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_client(api_key)
 
         message = client.messages.create(
             model="claude-3-5-haiku-20241022",  # Fastest Anthropic model
@@ -133,8 +156,7 @@ Name:"""
         if not api_key:
             raise Exception("No API key")
         
-        import anthropic
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_client(api_key)
         
         message = client.messages.create(
             model="claude-3-5-haiku-20241022",  # Fast model
@@ -13,6 +13,36 @@ import traceback
 from dotenv import load_dotenv
 
 
+# HTTP timeouts in seconds; stop.py sets HOOK_CONNECT_TIMEOUT / HOOK_READ_TIMEOUT
+CONNECT_TIMEOUT = float(os.getenv("HOOK_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("HOOK_READ_TIMEOUT", "60"))  # A local model can take much longer on a cold load
+
+# Shared client so repeated in-process calls reuse pooled connections
+_client = None
+
+
+def get_client():
+    """Return the shared Ollama client, creating it on first use."""
+    global _client
+    if _client is None:
+        import httpx
+        from openai import OpenAI
+
+        http_client = httpx.Client(
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        # Ollama uses OpenAI-compatible API - exactly as shown in docs
+        _client = OpenAI(
+            base_url='http://localhost:11434/v1',
+            api_key='ollama',  # required, but unused
+            http_client=http_client,
+            # Never re-issue to the local server; a retry would only double its load
+            max_retries=0,
+        )
+    return _client
+
+
 def prompt_llm(prompt_text):
     """
     Base Ollama LLM prompting method using GPT-OSS model.
@@ -26,13 +56,7 @@ def prompt_llm(prompt_text):
     load_dotenv()
     
     try:
-        from openai import OpenAI
-        
-        # Ollama uses OpenAI-compatible API - exactly as shown in docs
-        client = OpenAI(
-            base_url='http://localhost:11434/v1',
-            api_key='ollama',  # required, but unused
-        )
+        client = get_client()
         
         # Default to 20b model, can override with OLLAMA_MODEL env var
         model = os.getenv("OLLAMA_MODEL", "gpt-oss:20b")
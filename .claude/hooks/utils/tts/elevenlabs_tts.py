@@ -3,14 +3,615 @@
 # requires-python = ">=3.8"
 # dependencies = [
 #     "elevenlabs",
+#     "h2",
 #     "python-dotenv",
 # ]
 # ///
 
+import functools
+import hashlib
+import logging
 import os
+import re
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
+
+
+logger = logging.getLogger(__name__)
+
+# Spoken when no text is given on the command line
+DEFAULT_TEXT = "The first move is what sets everything in motion."
+
+# HTTP timeouts in seconds; stop.py sets HOOK_CONNECT_TIMEOUT / HOOK_READ_TIMEOUT
+CONNECT_TIMEOUT = float(os.getenv("HOOK_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("HOOK_READ_TIMEOUT", "7"))
+
+# Voice settings for generated speech
+# VOICE_ID = "pNInz6obpgDQGcFmaJgB"  # Adam voice
+VOICE_ID = "nPczCjzI2devNBz1zQrb"  # Brian voice (default)
+MODEL_ID = "eleven_turbo_v2_5"
+# 32 kbps is plenty for short spoken announcements; override with ELEVENLABS_FORMAT
+DEFAULT_OUTPUT_FORMAT = "mp3_22050_32"
+
+# Generated audio is kept here so repeated announcements skip the API entirely
+CACHE_DIR = Path.home() / ".cache" / "elevenlabs_tts"
+CACHE_MAX_FILES = 200  # least recently played files beyond this are pruned
+CACHE_PART_MAX_AGE = 300  # seconds before a .part left by a killed download is pruned
+
+# Background daemon holding a warm client between runs; disable with ELEVENLABS_TTS_DAEMON=0
+DAEMON_SOCKET = CACHE_DIR / "sock"
+DAEMON_IDLE_TIMEOUT = 600  # seconds without requests before the daemon exits
+# Seconds to wait for the daemon to finish a request; stop.py gives this whole script
+# 20 s, which must also fit a local retry of CONNECT_TIMEOUT + READ_TIMEOUT
+DAEMON_REPLY_TIMEOUT = 8
+
+# Shared client so repeated in-process calls reuse pooled connections
+_client = None
+
+
+def get_client(api_key):
+    """Return the shared ElevenLabs client, creating it on first use."""
+    global _client
+    if _client is None:
+        import importlib.util
+        import httpx
+        from elevenlabs.client import ElevenLabs
+
+        http_client = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        _client = ElevenLabs(api_key=api_key, timeout=READ_TIMEOUT, httpx_client=http_client)
+    return _client
+
+# Sentence boundaries: terminal punctuation followed by whitespace (so "3.5" never splits)
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s+')
+ABBREVIATIONS = frozenset({
+    "mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.", "e.g.", "i.e.",
+})
+MIN_SENTENCE_CHARS = 10
+
+# Sentences synthesized concurrently (the shared client keeps up to 4 connections alive)
+SYNTHESIS_WORKERS = 3
+
+# tmpfs for playback temp files so they never touch the disk (None = system default)
+TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Audio collected before the player starts, to ride out uneven chunk arrival
+PREBUFFER_SECONDS = 0.5
+PREBUFFER_BYTES = 16 * 1024  # used when the output format's bitrate is unknown
+
+# Players that can decode MP3 from stdin, in order of preference
+STREAM_PLAYERS = [
+    ("ffplay", ["-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "pipe:0"]),
+    ("mpv", ["--no-video", "--really-quiet", "-"]),
+    ("mpg123", ["-q", "-"]),
+]
+
+# Common Linux players for audio files, with arguments so they exit once the file has played
+FILE_PLAYERS = [
+    ("paplay", []),
+    ("aplay", []),
+    ("ffplay", ["-nodisp", "-autoexit", "-loglevel", "quiet"]),
+    ("mpg123", []),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def find_stream_player():
+    """Return the command line of the first installed stdin-capable player, or None (memoized)."""
+    import shutil
+
+    for name, player_args in STREAM_PLAYERS:
+        path = shutil.which(name)
+        if path:
+            return (path, *player_args)
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def find_file_player():
+    """Return the command line used to play an audio file on this system, or None (memoized)."""
+    import shutil
+
+    if sys.platform == "darwin":  # macOS
+        return ("afplay",)
+    if sys.platform.startswith("linux"):
+        for name, player_args in FILE_PLAYERS:
+            path = shutil.which(name)
+            if path:
+                return (path, *player_args)
+    return None
+
+
+def get_prebuffer_bytes(output_format):
+    """
+    Return how many bytes of output_format hold PREBUFFER_SECONDS of audio.
+
+    Formats look like "mp3_22050_32" (kbps last), "pcm_16000" (16-bit samples)
+    or "ulaw_8000"; anything else falls back to PREBUFFER_BYTES.
+    """
+    codec, _, params = output_format.partition("_")
+    numbers = params.split("_")
+    if not all(number.isdigit() for number in numbers):
+        return PREBUFFER_BYTES
+    if codec in ("mp3", "opus") and len(numbers) == 2:
+        bytes_per_second = int(numbers[1]) * 1000 // 8
+    elif codec == "pcm" and len(numbers) == 1:
+        bytes_per_second = int(numbers[0]) * 2
+    elif codec in ("ulaw", "alaw") and len(numbers) == 1:
+        bytes_per_second = int(numbers[0])
+    else:
+        return PREBUFFER_BYTES
+    return max(1, int(bytes_per_second * PREBUFFER_SECONDS))
+
+
+def stream_audio(chunks, command, prebuffer_bytes=PREBUFFER_BYTES):
+    """
+    Pipe audio chunks into a player's stdin as they arrive.
+
+    The player is started once prebuffer_bytes have arrived rather than after
+    the whole clip has downloaded. Returns once every chunk is handed to the
+    player; the player is detached and finishes on its own.
+
+    Args:
+        chunks (iterable): Audio bytes, e.g. the ElevenLabs response generator
+        command (tuple): Player command line reading from stdin
+        prebuffer_bytes (int): Audio to collect before starting the player
+    """
+    import subprocess
+
+    chunks = iter(chunks)
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= prebuffer_bytes:
+            break
+    if not buffer:
+        return
+
+    proc = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        proc.stdin.write(buffer)
+        for chunk in chunks:
+            proc.stdin.write(chunk)
+    except BrokenPipeError:
+        pass  # Player exited early; nothing left to feed
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def play_audio_file(audio_path, remove_after=False):
+    """
+    Start playing an audio file with the system player without waiting for it.
+
+    Args:
+        audio_path (str): The file to play
+        remove_after (bool): Delete the file once playback ends, even if this process
+            has already exited
+    """
+    import subprocess
+
+    if sys.platform == "win32":
+        os.startfile(audio_path)
+        return
+
+    command = find_file_player()
+    if command is None:
+        if remove_after:
+            os.unlink(audio_path)
+        return
+
+    if remove_after:
+        # Detached shell removes the file after playback, outliving this process
+        command = ("sh", "-c", '"$@"; rm -f "$0"', audio_path, *command)
+    try:
+        subprocess.Popen(
+            [*command, audio_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        if remove_after:
+            os.unlink(audio_path)
+        raise
+
+
+def get_output_format():
+    """Return the ElevenLabs output format, honouring ELEVENLABS_FORMAT."""
+    return os.getenv("ELEVENLABS_FORMAT") or DEFAULT_OUTPUT_FORMAT
+
+
+def get_cache_path(text, output_format):
+    """Return the cache file for text, keyed on its normalized SHA-256."""
+    key = hashlib.sha256(text.strip().lower().encode()).hexdigest()
+    return CACHE_DIR / f"{key}_{VOICE_ID}_{MODEL_ID}_{output_format}.mp3"
+
+
+def tee_to_cache(chunks, cache_path):
+    """
+    Yield audio chunks while also writing them to the cache.
+
+    The file is written as a .part and only moved into place once the whole
+    response has been received, so a cut-off download is never served later.
+
+    Args:
+        chunks (iterable): Audio bytes from the API
+        cache_path (Path): Final location of the cached MP3
+    """
+    part_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.part")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        part = open(part_path, "wb")
+    except OSError:
+        yield from chunks  # Cache not writable; just pass the audio through
+        return
+
+    complete = False
+    try:
+        with part:
+            for chunk in chunks:
+                part.write(chunk)
+                yield chunk
+        os.replace(part_path, cache_path)
+        complete = True
+    finally:
+        if not complete:
+            try:
+                os.unlink(part_path)
+            except OSError:
+                pass
+    prune_cache(cache_path.parent)
+
+
+def prune_cache(cache_dir, max_files=CACHE_MAX_FILES):
+    """
+    Delete the least recently played cached MP3s beyond max_files.
+
+    Cache hits refresh the file's mtime, so frequently repeated
+    announcements survive while one-off messages age out. Partial downloads
+    untouched for CACHE_PART_MAX_AGE seconds belong to runs that were killed
+    mid-download and are deleted too.
+
+    Args:
+        cache_dir (Path): Directory holding the cached audio
+        max_files (int): Number of files to keep
+    """
+    import time
+
+    stale_before = time.time() - CACHE_PART_MAX_AGE
+    entries, stale_parts = [], []
+    try:
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith(".mp3"):
+                entries.append((entry.stat().st_mtime, entry.path))
+            elif entry.name.endswith(".part") and entry.stat().st_mtime < stale_before:
+                stale_parts.append(entry.path)
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    for path in stale_parts + [path for _, path in entries[max_files:]]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass  # Already pruned by a concurrent run
+
+
+def _split_sentences(text):
+    """
+    Split text into sentences for separate synthesis.
+
+    Common abbreviations do not end a sentence, and pieces shorter than
+    MIN_SENTENCE_CHARS are merged into their neighbour.
+
+    Args:
+        text (str): The text to split
+
+    Returns:
+        list: The sentences, in order
+    """
+    sentences = []
+    current = ""
+    for piece in SENTENCE_END_PATTERN.split(text.strip()):
+        current = f"{current} {piece}" if current else piece
+        if len(current) < MIN_SENTENCE_CHARS or current.rsplit(None, 1)[-1].lower() in ABBREVIATIONS:
+            continue
+        sentences.append(current)
+        current = ""
+    if current:
+        if sentences and len(current) < MIN_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {current}"
+        else:
+            sentences.append(current)
+    return sentences
+
+
+def synthesize_sentences(elevenlabs, sentences, output_format):
+    """
+    Yield audio for each sentence in order, generating up to SYNTHESIS_WORKERS at once.
+
+    Each sentence streams into its own queue, so later sentences download
+    while earlier audio is still being fed to the player.
+
+    Args:
+        elevenlabs: The ElevenLabs client
+        sentences (list): Sentences to speak, in order
+        output_format (str): ElevenLabs output format
+    """
+    import queue
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    stop = threading.Event()
+
+    def produce(sentence, chunks):
+        try:
+            if stop.is_set():
+                return
+            for chunk in elevenlabs.text_to_speech.stream(
+                text=sentence,
+                voice_id=VOICE_ID,
+                model_id=MODEL_ID,
+                output_format=output_format,
+            ):
+                if stop.is_set():
+                    return
+                chunks.put(chunk)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(None)
+
+    sentence_queues = [queue.Queue() for _ in sentences]
+    executor = ThreadPoolExecutor(max_workers=SYNTHESIS_WORKERS)
+    try:
+        for sentence, chunks in zip(sentences, sentence_queues):
+            executor.submit(produce, sentence, chunks)
+        for chunks in sentence_queues:
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+    finally:
+        # Abandon sentences not yet played if the caller stopped early
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def speak(text, output_format=None):
+    """
+    Generate speech for text with ElevenLabs Turbo v2.5 and start playing it.
+
+    Importable entry point used by the hooks to avoid a `uv run` per call.
+    Text spoken before is replayed from CACHE_DIR without an API call.
+
+    Args:
+        text (str): The text to speak
+        output_format (str): ElevenLabs output format (defaults to get_output_format())
+
+    Raises:
+        ImportError: If the elevenlabs package is not installed
+        RuntimeError: If ELEVENLABS_API_KEY is not set
+    """
+    # Replay cached audio without touching the API
+    output_format = output_format or get_output_format()
+    cache_path = get_cache_path(text, output_format)
+    command = find_stream_player()
+    if cache_path.exists():
+        try:
+            os.utime(cache_path)  # Mark as recently played for prune_cache
+        except OSError:
+            pass
+        if command:
+            stream_audio([cache_path.read_bytes()], command)
+        else:
+            play_audio_file(str(cache_path))
+        return
+
+    api_key = os.getenv('ELEVENLABS_API_KEY')
+    if not api_key:
+        raise RuntimeError("ELEVENLABS_API_KEY not found in environment variables")
+
+    # Initialize client
+    elevenlabs = get_client(api_key)
+
+    # Generate audio on the streaming endpoint, which yields chunks as the model produces them.
+    # Longer texts are synthesized sentence by sentence so playback starts after the first one.
+    sentences = _split_sentences(text)
+    if len(sentences) > 1:
+        audio_generator = synthesize_sentences(elevenlabs, sentences, output_format)
+    else:
+        audio_generator = elevenlabs.text_to_speech.stream(
+            text=text,
+            voice_id=VOICE_ID,
+            model_id=MODEL_ID,
+            output_format=output_format,
+        )
+    audio_generator = tee_to_cache(audio_generator, cache_path)
+
+    # Stream straight into the player when one can read from stdin
+    if command:
+        stream_audio(audio_generator, command, get_prebuffer_bytes(output_format))
+        return
+
+    # Otherwise save to a temporary file, RAM-backed where available
+    import tempfile
+
+    with tempfile.NamedTemporaryFile(suffix=".mp3", dir=TEMP_DIR, delete=False) as temp_audio:
+        # Write audio chunks to file
+        for chunk in audio_generator:
+            temp_audio.write(chunk)
+        temp_audio_path = temp_audio.name
+
+    # Returns once playback has started; the player removes the temp file when done
+    play_audio_file(temp_audio_path, remove_after=True)
+
+
+def daemon_enabled():
+    """Return True unless the daemon is disabled or Unix sockets are unavailable."""
+    return os.getenv("ELEVENLABS_TTS_DAEMON", "1") != "0" and sys.platform != "win32"
+
+
+def _recv_all(sock):
+    """Read from a socket until the peer closes its side."""
+    data = bytearray()
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return bytes(data)
+        data += chunk
+
+
+def key_fingerprint(api_key):
+    """Return a short digest identifying api_key without revealing it."""
+    return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+
+def speak_via_daemon(text, output_format):
+    """
+    Hand text to the background daemon, which speaks it with its warm client.
+
+    The request carries a fingerprint of this process's API key; a daemon
+    started with a different key exits without speaking.
+
+    Args:
+        text (str): The text to speak
+        output_format (str): ElevenLabs output format
+
+    Returns:
+        bool: False if the daemon did not speak the text (none listening, stale,
+        too slow or failed), in which case the caller speaks it locally
+    """
+    import json
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(DAEMON_SOCKET))
+        except OSError:
+            return False
+        sock.settimeout(DAEMON_REPLY_TIMEOUT)
+        request = {
+            "text": text,
+            "output_format": output_format,
+            "key": key_fingerprint(os.getenv("ELEVENLABS_API_KEY")),
+        }
+        try:
+            sock.sendall(json.dumps(request).encode())
+            sock.shutdown(socket.SHUT_WR)
+            reply = _recv_all(sock)
+        except OSError:
+            logger.info("⚠️  Daemon did not answer within %ss; speaking locally", DAEMON_REPLY_TIMEOUT)
+            return False
+
+    if not reply:
+        return False  # Daemon went away or was stale; it exits so a fresh one can start
+    if reply != b"ok":
+        logger.info("⚠️  Daemon failed (%s); speaking locally", reply.decode(errors="replace"))
+        return False
+    return True
+
+
+def spawn_daemon():
+    """
+    Start the background daemon, detached so it outlives this process.
+
+    The daemon inherits this environment, including the HOOK_*_TIMEOUT settings.
+    """
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def serve():
+    """
+    Run the background daemon on DAEMON_SOCKET.
+
+    Requests are spoken one at a time through the shared client, so its HTTPS
+    connections stay warm across invocations. Exits after DAEMON_IDLE_TIMEOUT
+    seconds without requests, at once if another daemon is already listening,
+    and without replying when a request was made with a different API key.
+    """
+    import json
+    import socket
+
+    fingerprint = key_fingerprint(os.getenv("ELEVENLABS_API_KEY"))
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = str(DAEMON_SOCKET)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    except OSError:
+        # The socket file exists: leave if a daemon answers, otherwise it is stale
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+                server.close()
+                return
+            except OSError:
+                pass
+        os.unlink(path)
+        server.bind(path)
+    os.chmod(path, 0o600)
+    inode = os.stat(path).st_ino
+    server.listen()
+    server.settimeout(DAEMON_IDLE_TIMEOUT)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            with conn:
+                conn.settimeout(DAEMON_REPLY_TIMEOUT)
+                try:
+                    data = _recv_all(conn)
+                    if not data:
+                        continue  # Liveness probe
+                    request = json.loads(data)
+                    if request.get("key") != fingerprint:
+                        break  # Key rotated since start; the caller speaks locally and respawns
+                    speak(request["text"], request.get("output_format"))
+                    reply = b"ok"
+                except Exception as e:
+                    reply = f"{type(e).__name__}: {e}".encode()
+                try:
+                    conn.sendall(reply)
+                except OSError:
+                    pass
+    finally:
+        server.close()
+        # Only remove the socket if a newer daemon has not replaced it
+        try:
+            if os.stat(path).st_ino == inode:
+                os.unlink(path)
+        except OSError:
+            pass
+
 
 def main():
     """
@@ -22,99 +623,85 @@ def main():
     Usage:
     - ./eleven_turbo_tts.py                    # Uses default text
     - ./eleven_turbo_tts.py "Your custom text" # Uses provided text
+    - ./eleven_turbo_tts.py --verbose "Text"   # Also prints progress (or TTS_VERBOSE=1)
+    - ./eleven_turbo_tts.py --serve            # Run the background daemon (started automatically)
     
     Features:
     - Fast generation (optimized for real-time use)
     - High-quality voice synthesis
     - Stable production model
     - Cost-effective for high-volume usage
+    - Warm background daemon reuses HTTPS connections (ELEVENLABS_TTS_DAEMON=0 disables)
     """
     
-    # Load environment variables
-    load_dotenv()
-    
-    # Get API key from environment
+    # Load .env only when the key is not already in the environment (hooks inherit it)
     api_key = os.getenv('ELEVENLABS_API_KEY')
     if not api_key:
-        print("❌ Error: ELEVENLABS_API_KEY not found in environment variables")
-        print("Please add your ElevenLabs API key to .env file:")
-        print("ELEVENLABS_API_KEY=your_api_key_here")
+        from dotenv import load_dotenv
+        load_dotenv()
+        api_key = os.getenv('ELEVENLABS_API_KEY')
+
+    # Progress output only with --verbose or TTS_VERBOSE=1; hooks run silently
+    args = sys.argv[1:]
+    verbose = "--verbose" in args or os.getenv("TTS_VERBOSE") == "1"
+    args = [arg for arg in args if arg != "--verbose"]
+    logging.basicConfig(
+        level=logging.INFO if verbose else logging.WARNING,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
+    
+    if not api_key:
+        logger.error("❌ Error: ELEVENLABS_API_KEY not found in environment variables")
+        logger.error("Please add your ElevenLabs API key to .env file:")
+        logger.error("ELEVENLABS_API_KEY=your_api_key_here")
         sys.exit(1)
     
-    try:
-        from elevenlabs.client import ElevenLabs
-        import tempfile
-        import subprocess
-        import platform
+    if "--serve" in args:
+        serve()
+        return
 
-        # Initialize client
-        elevenlabs = ElevenLabs(api_key=api_key)
-
-        print("🎙️  ElevenLabs Turbo v2.5 TTS")
-        print("=" * 40)
+    try:
+        logger.info("🎙️  ElevenLabs Turbo v2.5 TTS")
+        logger.info("=" * 40)
 
         # Get text from command line argument or use default
-        if len(sys.argv) > 1:
-            text = " ".join(sys.argv[1:])  # Join all arguments as text
+        if len(args) == 1:
+            text = args[0]  # Hooks pass the message as a single argument
+        elif args:
+            text = " ".join(args)  # Join all arguments as text
         else:
-            text = "The first move is what sets everything in motion."
+            text = DEFAULT_TEXT
 
-        print(f"🎯 Text: {text}")
-        print("🔊 Generating and playing...")
+        logger.info("🎯 Text: %s", text)
+        logger.info("🔊 Generating and playing...")
 
         try:
-            # Generate audio
-            audio_generator = elevenlabs.text_to_speech.convert(
-                text=text,
-                # voice_id="pNInz6obpgDQGcFmaJgB",  # Adam voice (default)
-                voice_id="nPczCjzI2devNBz1zQrb",  # Brian voice (default)
-                model_id="eleven_turbo_v2_5",
-                output_format="mp3_44100_128",
-            )
-
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio:
-                # Write audio chunks to file
-                for chunk in audio_generator:
-                    temp_audio.write(chunk)
-                temp_audio_path = temp_audio.name
-
-            # Play audio using system player
-            system = platform.system()
-            if system == "Darwin":  # macOS
-                subprocess.run(["afplay", temp_audio_path], check=True)
-            elif system == "Linux":
-                # Try common Linux audio players
-                for player in ["paplay", "aplay", "ffplay", "mpg123"]:
-                    try:
-                        subprocess.run([player, temp_audio_path], check=True, stderr=subprocess.DEVNULL)
-                        break
-                    except (subprocess.CalledProcessError, FileNotFoundError):
-                        continue
-            elif system == "Windows":
-                os.startfile(temp_audio_path)
-
-            print("✅ Playback complete!")
-
-            # Clean up temp file
-            try:
-                os.unlink(temp_audio_path)
-            except:
-                pass
+            output_format = get_output_format()
+            # Cached audio plays locally; otherwise hand off to the warm daemon, starting it if needed
+            if daemon_enabled() and not get_cache_path(text, output_format).exists():
+                if speak_via_daemon(text, output_format):
+                    logger.info("✅ Playback started!")
+                    return
+                spawn_daemon()  # Exits at once if a daemon is still listening
+            speak(text, output_format)
+            logger.info("✅ Playback started!")
 
+        except ImportError:
+            raise
         except Exception as e:
-            print(f"❌ Error during generation/playback: {e}")
-            print(f"Error type: {type(e).__name__}")
+            logger.error("❌ Error during generation/playback: %s", e)
+            logger.error("Error type: %s", type(e).__name__)
         
         
     except ImportError:
-        print("❌ Error: elevenlabs package not installed")
-        print("This script uses UV to auto-install dependencies.")
-        print("Make sure UV is installed: https://docs.astral.sh/uv/")
+        logger.error("❌ Error: elevenlabs package not installed")
+        logger.error("This script uses UV to auto-install dependencies.")
+        logger.error("Make sure UV is installed: https://docs.astral.sh/uv/")
         sys.exit(1)
     except Exception as e:
-        print(f"❌ Unexpected error: {e}")
+        logger.error("❌ Unexpected error: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
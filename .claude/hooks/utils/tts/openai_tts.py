@@ -15,6 +15,61 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 
+# HTTP timeouts in seconds; stop.py sets HOOK_CONNECT_TIMEOUT / HOOK_READ_TIMEOUT
+CONNECT_TIMEOUT = float(os.getenv("HOOK_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("HOOK_READ_TIMEOUT", "7"))
+
+
+async def stream_speech(text):
+    """
+    Generate speech for text with OpenAI TTS and stream it to the speakers.
+
+    Args:
+        text (str): The text to speak
+
+    Raises:
+        ImportError: If the openai package is not installed
+        RuntimeError: If OPENAI_API_KEY is not set
+    """
+    import httpx
+    from openai import AsyncOpenAI
+    from openai.helpers import LocalAudioPlayer
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY not found in environment variables")
+
+    # Initialize OpenAI client
+    openai = AsyncOpenAI(
+        api_key=api_key,
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        # No retries, so connect + read stays within stop.py's 20s TTS timeout
+        max_retries=0,
+    )
+
+    # Generate and stream audio using OpenAI TTS
+    async with openai.audio.speech.with_streaming_response.create(
+        model="gpt-4o-mini-tts",
+        voice="nova",
+        input=text,
+        instructions="Speak in a cheerful, positive yet professional tone.",
+        response_format="mp3",
+    ) as response:
+        await LocalAudioPlayer().play(response)
+
+
+def speak(text):
+    """
+    Speak text with OpenAI TTS.
+
+    Importable entry point used by the hooks to avoid a `uv run` per call.
+
+    Args:
+        text (str): The text to speak
+    """
+    asyncio.run(stream_speech(text))
+
+
 async def main():
     """
     OpenAI TTS Script
@@ -45,12 +100,6 @@ async def main():
         sys.exit(1)
 
     try:
-        from openai import AsyncOpenAI
-        from openai.helpers import LocalAudioPlayer
-
-        # Initialize OpenAI client
-        openai = AsyncOpenAI(api_key=api_key)
-
         print("🎙️  OpenAI TTS")
         print("=" * 20)
 
@@ -64,18 +113,12 @@ async def main():
         print("🔊 Generating and streaming...")
 
         try:
-            # Generate and stream audio using OpenAI TTS
-            async with openai.audio.speech.with_streaming_response.create(
-                model="gpt-4o-mini-tts",
-                voice="nova",
-                input=text,
-                instructions="Speak in a cheerful, positive yet professional tone.",
-                response_format="mp3",
-            ) as response:
-                await LocalAudioPlayer().play(response)
+            await stream_speech(text)
 
             print("✅ Playback complete!")
 
+        except ImportError:
+            raise
         except Exception as e:
             print(f"❌ Error: {e}")
 
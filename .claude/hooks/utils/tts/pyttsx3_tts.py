@@ -9,6 +9,33 @@
 import sys
 import random
 
+
+def speak(text):
+    """
+    Speak text offline with pyttsx3.
+
+    Importable entry point used by the hooks to avoid a `uv run` per call.
+
+    Args:
+        text (str): The text to speak
+
+    Raises:
+        ImportError: If the pyttsx3 package is not installed
+    """
+    import pyttsx3
+
+    # Initialize TTS engine
+    engine = pyttsx3.init()
+
+    # Configure engine settings
+    engine.setProperty('rate', 180)    # Speech rate (words per minute)
+    engine.setProperty('volume', 0.8)  # Volume (0.0 to 1.0)
+
+    # Speak the text
+    engine.say(text)
+    engine.runAndWait()
+
+
 def main():
     """
     pyttsx3 TTS Script
@@ -28,15 +55,6 @@ def main():
     """
     
     try:
-        import pyttsx3
-        
-        # Initialize TTS engine
-        engine = pyttsx3.init()
-        
-        # Configure engine settings
-        engine.setProperty('rate', 180)    # Speech rate (words per minute)
-        engine.setProperty('volume', 0.8)  # Volume (0.0 to 1.0)
-        
         print("🎙️  pyttsx3 TTS")
         print("=" * 15)
         
@@ -57,9 +75,7 @@ def main():
         print(f"🎯 Text: {text}")
         print("🔊 Speaking...")
         
-        # Speak the text
-        engine.say(text)
-        engine.runAndWait()
+        speak(text)
         
         print("✅ Playback complete!")
         